@@ -5,23 +5,26 @@
 # Copyright (c) 2022-2024 Fred W6BSD
 # All rights reserved.
 #
-# pylint: disable=consider-using-with
+# pylint: disable=consider-using-with,too-many-instance-attributes,import-outside-toplevel
 
+import atexit
 import dbm
-import json
 import logging
 import marshal
 import os
-import re
+import queue
+import struct
+import threading
 import time
 import urllib.parse
-import urllib.request
+import xml.etree.ElementTree as ET
+import zlib
+from collections import OrderedDict
+from dataclasses import field, make_dataclass
 from functools import wraps
-from getpass import getpass
 from importlib.metadata import version
 from pathlib import Path
-from typing import Tuple, Union
-from xml.dom import minidom
+from typing import Any, Dict, Iterable, Tuple, Union
 
 __version__ = version("qrzlib")
 
@@ -31,8 +34,14 @@ logging.basicConfig(
 )
 
 AGENT = b'Python QRZ API'
+AGENT_ENCODED = urllib.parse.quote_plus(AGENT)
 URL = "https://xmldata.qrz.com/xml/current/"
+QRZ_NS = 'http://xmldata.qrz.com'
 DBM_FILE = Path('~', '.local', 'qrz-cache').expanduser()
+MISS = object()
+TIMEOUT = 30
+WORKERS = 4
+MEM_CACHE_SIZE = 1024
 
 
 class DBMCache:
@@ -58,19 +67,26 @@ class DBMCache:
     'M': 3600 * 24 * 30.5,
     'Y': 3600 * 24 * 7 * 52,
   }
+  _HEADER = struct.Struct('<d')
 
-  def __init__(self, dbm_file: Path, expire: str = '1Y'):
+  def __init__(self, dbm_file: Path, expire: str = '1Y', wb_limit: int = 256):
     """DBM cache constructor. A cache expiration of 0 mean the data
     cached never expire.
     The expiration time can be expressed with an integer followed by
     the the character [YMWDH] for Year, Month, Week, Days or Hours.
+    The records stored are buffered and written to the database once
+    `wb_limit` records are pending, on flush() or on close(). The
+    records still buffered are lost if the process is killed.
 
     """
-    self.log = logging.getLogger('DBMCache')
+    self.log = logging.getLogger(__name__).getChild('DBMCache')
     self.log.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
     self._dbm_file = dbm_file
-    self._create_db()
-    self._kexpire = f"_{self.__class__.__name__}_expire_"
+    self._lock = threading.Lock()
+    self._fdb = None
+    self._stamp: Tuple = ()
+    self._wb: Dict[str, bytes] = {}
+    self._wb_limit = wb_limit
     self._expire: float = 0.0
 
     if isinstance(expire, int):
@@ -79,86 +95,201 @@ class DBMCache:
     if not isinstance(expire, str):
       raise SystemError('Expiration time error')
 
-    match = re.match(r'^(\d+)(|[YMWDH])$', expire, re.IGNORECASE)
-    if not match:
+    # <ascii digits>[YMWDH], without a unit the time is in minutes.
+    _time, _mult = expire[:-1], expire[-1:].upper()
+    if _mult.isdigit():
+      _time, _mult = expire, ''
+    if not (_time.isascii() and _time.isdigit()):
       raise SystemError('Expiration time error')
-    _time = int(match.group(1))
-    _mult = match.group(2).upper()
     try:
-      self._expire = _time * DBMCache._EXPIRE_MULT[_mult]
+      self._expire = int(_time) * DBMCache._EXPIRE_MULT[_mult]
     except KeyError as err:
       raise SystemError(f'Wrong expiration time: "{expire}" - {err}') from None
-    self.log.debug(self)
-
-  def _create_db(self):
-    if self._dbm_file.exists():
+    if self.log.isEnabledFor(logging.DEBUG):
+      self.log.debug(self)
+
+  def _db_stamp(self) -> Tuple:
+    """Modification time and size of the database files. They change
+    when any process writes to the database."""
+    stamp = []
+    for suffix in ('', '.dir', '.db', '.pag'):
+      try:
+        stat = os.stat(f'{self._dbm_file}{suffix}')
+      except OSError:
+        continue
+      stamp.append((suffix, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+  def _reader(self):
+    """Return the read handle, opened on first use. It is opened again
+    when the database has been written since, by this process or
+    another one, so the index is always current. An empty dict stands
+    for a database not created yet. With gdbm the file is opened without
+    the reader lock, which would block the writers of other processes
+    for as long as the handle stays open. The lock must be held."""
+    stamp = self._db_stamp()
+    if self._fdb is None or stamp != self._stamp:
+      self._close_reader()
+      self._fdb = {}
+      if stamp:
+        flag = 'ru' if dbm.whichdb(str(self._dbm_file)) == 'dbm.gnu' else 'r'
+        self._fdb = dbm.open(str(self._dbm_file), flag)
+      self._stamp = stamp
+    return self._fdb
+
+  def _read(self, key: str) -> Union[bytes, None]:
+    """Read a value through the unlocked handle. When another process
+    writes the database between the stamp check and the read, the
+    handle is opened again and the read is tried once more. The lock
+    must be held."""
+    try:
+      return self._reader().get(key)
+    except dbm.error:
+      self._close_reader()
+    return self._reader().get(key)
+
+  def _close_reader(self) -> None:
+    if self._fdb:
+      self._fdb.close()
+    self._fdb = None
+
+  def close(self) -> None:
+    """Write the pending records and close the database. The cache
+    shared by the QRZ objects is closed when the program exits."""
+    with self._lock:
+      self._flush()
+      self._close_reader()
+
+  def flush(self) -> None:
+    """Write the buffered records to the database."""
+    with self._lock:
+      self._flush()
+
+  def _flush(self) -> None:
+    """Write the buffer through a handle opened for this batch only, so
+    the index written by other processes is merged, and the gdbm writer
+    lock is released right after."""
+    if not self._wb:
       return
-
+    self._close_reader()
     try:
       if not self._dbm_file.parent.exists():
-        self._dbm_file.parent.mkdir()
-      with dbm.open(str(self._dbm_file), 'c'):
-        pass
-    except IOError as err:
+        self._dbm_file.parent.mkdir(parents=True)
+      with dbm.open(str(self._dbm_file), 'c') as fdb:
+        for key, value in self._wb.items():
+          fdb[key] = value
+    except dbm.error as err:
       self.log.error(err)
-      raise SystemExit(err) from None
+      raise IOError(err) from err
+    self._wb.clear()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
 
   def __repr__(self):
     return f'db: {self._dbm_file} expire: {self._expire}'
 
   def __len__(self):
     try:
-      return len(dbm.open(str(self._dbm_file), 'r'))
+      with self._lock:
+        self._flush()
+        return len(self._reader())
     except dbm.error as err:
       raise SystemError(err) from None
 
   def __contains__(self, key: str):
     try:
-      with dbm.open(str(self._dbm_file), 'r') as fdb:
-        return key in fdb
+      with self._lock:
+        if key in self._wb:
+          return True
+        return key in self._reader()
     except dbm.error as err:
       logging.error(err)
       raise SystemError(err) from None
 
-  def get_key(self, key: str) -> Union[dict, None]:
+  def get_key(self, key: str) -> dict:
+    record = self.get_or_miss(key)
+    if record is MISS:
+      raise KeyError(key)
+    return record
+
+  def get_or_miss(self, key: str):
+    """Return the cached record or the MISS sentinel when the key is
+    not in the cache or has expired."""
     try:
-      with dbm.open(str(self._dbm_file), 'r') as fdb:
-        record = marshal.loads(fdb[key])
-        if self._expire == 0 or record[self._kexpire] > time.time() - self._expire:
-          del record[self._kexpire]
-          self.log.debug('%s found in cache', key)
-          return record
-        self.log.debug('Cache expired')
-        raise KeyError(key)
+      with self._lock:
+        raw = self._wb.get(key)
+        if raw is None:
+          raw = self._read(key)
     except dbm.error as err:
       logging.error(err)
       raise SystemError(err) from None
+    if raw is None or len(raw) < DBMCache._HEADER.size:
+      return MISS
+
+    view = memoryview(raw)
+    (timestamp, ) = DBMCache._HEADER.unpack_from(view)
+    now = time.time()
+    if not 0 < timestamp <= now or (self._expire and timestamp < now - self._expire):
+      if self.log.isEnabledFor(logging.DEBUG):
+        self.log.debug('Cache expired')
+      return MISS
+
+    record = self._loads(key, view)
+    if self.log.isEnabledFor(logging.DEBUG) and record is not MISS:
+      self.log.debug('%s found in cache', key)
+    return record
 
   def expire(self, key: str) -> bool:
-    with dbm.open(str(self._dbm_file), 'c') as fdb:
-      if key in fdb:
-        del fdb[key]
-        return True
-    return False
+    with self._lock:
+      found = self._wb.pop(key, None) is not None
+      if key in self._reader():
+        self._close_reader()
+        with dbm.open(str(self._dbm_file), 'w') as fdb:
+          del fdb[key]
+        found = True
+    return found
 
   def store_key(self, key, data) -> None:
-    data[self._kexpire] = time.time()
+    value = self._dumps(data)
+    with self._lock:
+      self._wb[key] = value
+      if len(self._wb) >= self._wb_limit:
+        self._flush()
+
+  @staticmethod
+  def _dumps(data: dict) -> bytes:
+    """Serialize a record. The value stored is the timestamp packed as
+    a little-endian double followed by the compressed marshaled record,
+    so the expiration can be checked without decoding the record."""
+    return DBMCache._HEADER.pack(time.time()) + zlib.compress(marshal.dumps(data))
+
+  def _loads(self, key: str, raw: memoryview):
+    """Deserialize a record. Records that cannot be decoded, for example
+    when they have been written by a different version of Python, are
+    treated as cache misses."""
     try:
-      with dbm.open(str(self._dbm_file), 'c') as fdb:
-        fdb[key] = marshal.dumps(data)
-    except dbm.error as err:
-      self.log.error(err)
-      raise IOError from err
+      record = marshal.loads(zlib.decompress(raw[DBMCache._HEADER.size:]))
+    except (EOFError, ValueError, TypeError, zlib.error):
+      if self.log.isEnabledFor(logging.DEBUG):
+        self.log.debug('Corrupted cache record %s', key)
+      return MISS
+    if not isinstance(record, dict):
+      return MISS
+    return record
 
   def __call__(self, func, *args):
     """Simple cache decorator."""
     @wraps(func)
     def gdb_cache(*args):
       key = args[1]
-      try:
-        record = self.get_key(key)
+      record = self.get_or_miss(key)
+      if record is not MISS:
         return record
-      except KeyError:
+      if self.log.isEnabledFor(logging.DEBUG):
         self.log.debug('Load %s from QRZ', key)
 
       try:
@@ -172,6 +303,33 @@ class DBMCache:
     return gdb_cache
 
 
+XML_KEYS = (
+  'call', 'aliases', 'dxcc', 'fname', 'name', 'name_fmt', 'addr1', 'addr2',
+  'state', 'zip', 'country', 'ccode', 'lat', 'lon', 'grid', 'county', 'fips',
+  'land', 'efdate', 'expdate', 'p_call', 'class', 'codes', 'qslmgr',
+  'email', 'url', 'u_views', 'bio', 'image', 'serial', 'moddate', 'MSA',
+  'AreaCode', 'TimeZone', 'GMTOffset', 'DST', 'eqsl', 'mqsl', 'cqzone',
+  'ituzone', 'geoloc', 'born',
+)
+
+_WANTED = frozenset(XML_KEYS)
+
+# Qualified xml tag -> record key, precomputed for the QRZ namespace.
+_TAGS = {f'{{{QRZ_NS}}}{tag}': tag for tag in XML_KEYS}
+
+# xml tag -> QRZData attribute. 'class' is a python keyword.
+_ATTRS = {tag: 'CLASS' if tag == 'class' else tag for tag in XML_KEYS}
+
+QRZData = make_dataclass(
+  'QRZData', [(attr, Union[str, None], field(default=None)) for attr in _ATTRS.values()],
+  slots=True,
+)
+# QRZData is created at runtime, type checkers cannot use it in annotations.
+_Record = Any
+# Current record before the first lookup and after a NotFound.
+_NO_RECORD = QRZData()
+
+
 class QRZ:
   class SessionError(Exception):
     pass
@@ -179,127 +337,312 @@ class QRZ:
   class NotFound(KeyError):
     pass
 
-  _xml_keys = [
-    'call', 'aliases', 'dxcc', 'fname', 'name', 'name_fmt', 'addr1', 'addr2',
-    'state', 'zip', 'country', 'ccode', 'lat', 'lon', 'grid', 'county', 'fips',
-    'land', 'efdate', 'expdate', 'p_call', 'class', 'codes', 'qslmgr',
-    'email', 'url', 'u_views', 'bio', 'image', 'serial', 'moddate', 'MSA',
-    'AreaCode', 'TimeZone', 'GMTOffset', 'DST', 'eqsl', 'mqsl', 'cqzone',
-    'ituzone', 'geoloc', 'born',
-  ]
-
-  def __init__(self) -> None:
-    self.log = logging.getLogger('QRZ')
+  def __init__(self, mem_cache_size: int = MEM_CACHE_SIZE) -> None:
+    """The last `mem_cache_size` records looked up are kept in memory
+    in front of the dbm cache. The callsigns not found are remembered
+    for the lifetime of the object."""
+    self.log = logging.getLogger(__name__).getChild('QRZ')
     self.log.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
-    self.key: Union[bytes, None]
-    self.error: Union[bytes, None]
-    self._data: dict = {}
+    self.key: Union[bytes, None] = None
+    self.error: Union[bytes, None] = None
+    self._data = _NO_RECORD
+    self._url = urllib.parse.urlsplit(URL)
+    self._pool: queue.SimpleQueue = queue.SimpleQueue()
+    self._params_prefix: bytes = b''
+    self._mem: OrderedDict = OrderedDict()
+    self._mem_lock = threading.Lock()
+    self._mem_size = mem_cache_size
+    self._notfound: set = set()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def close(self) -> None:
+    """Write the pending records to the cache and close the HTTPS
+    connections to QRZ. Records looked up since the last write are lost
+    if the process is killed before close() or a normal exit."""
+    try:
+      self._cache.flush()
+    finally:
+      while True:
+        try:
+          self._pool.get_nowait().close()
+        except queue.Empty:
+          break
 
   def authenticate(self, user: str, password: str) -> None:
-    url_args = {"username": user.encode('utf-8'), "password": password.encode('utf-8'),
-                "agent": AGENT}
-    params: bytes = urllib.parse.urlencode(url_args).encode('ascii')
-
-    response = urllib.request.urlopen(URL, params)
-    with minidom.parse(response) as dom:
-      key = QRZ._getdata(dom, 'Key')
-      self.key = key.encode('utf-8') if key else None
-      error = QRZ._getdata(dom, 'Error')
-      self.error = error.encode('utf-8') if error else None
+    quote = urllib.parse.quote_plus
+    params = f"username={quote(user)}&password={quote(password)}&agent={AGENT_ENCODED}"
+    root = ET.fromstring(self._post(params.encode('ascii')))
+    session = root.find('{*}Session')
+    key = QRZ._getdata(session, 'Key')
+    self.key = key.encode('utf-8') if key else None
+    error = QRZ._getdata(session, 'Error')
+    self.error = error.encode('utf-8') if error else None
 
     if not self.key:
       self.log.error('Authentication error: %s', self.error)
       raise QRZ.SessionError(self.error)
+    self._params_prefix = (
+      f"s={quote(self.key)}&agent={AGENT_ENCODED}&callsign=".encode('ascii')
+    )
+
+  _cache = DBMCache(DBM_FILE)
+  atexit.register(_cache.close)
+
+  def _fetch(self, callsign: str) -> dict:
+    if not (callsign.isascii() and callsign.isalnum()):
+      callsign = urllib.parse.quote_plus(callsign)
+    params = self._params_prefix + callsign.encode('ascii')
+
+    # The whole body is parsed by the feed() call, close() raises a
+    # ParseError on an empty or truncated response so it is not cached.
+    # The fields are then collected from the end events until the
+    # <Callsign> record is complete, the events of the <Session> block
+    # that follows are not read.
+    data: dict = dict.fromkeys(XML_KEYS)
+    # Any: the stubs type read_events() for every kind of event, only
+    # element 'end' events are requested here.
+    parser: Any = ET.XMLPullParser(events=('end',))
+    parser.feed(self._post(params))
+    parser.close()
+    get_tagname = _TAGS.get
+    for _, elem in parser.read_events():
+      tagname = get_tagname(elem.tag)
+      if tagname is None:
+        tagname = elem.tag.rpartition('}')[2]
+        if tagname == 'Callsign':
+          return data
+        if tagname == 'Session' and self.log.isEnabledFor(logging.DEBUG):
+          self.log.debug('Not Found: %s', QRZ._getdata(elem, 'Error'))
+        if tagname not in _WANTED:
+          continue
+      data[tagname] = elem.text or ''
+      elem.clear()
+    return {}
+
+  _get_call = _cache(_fetch)
 
-  @DBMCache(DBM_FILE)
-  def _get_call(self, callsign: str) -> dict:
+  def get_call(self, callsign: str):
+    if not self.key:
+      raise QRZ.SessionError('First authenticate')
     callsign = callsign.upper()
-    url_args = {"s": self.key, "callsign": callsign, "agent": AGENT}
-    params: bytes = urllib.parse.urlencode(url_args).encode('ascii')
-
-    response = urllib.request.urlopen(URL, params)
-    with minidom.parse(response) as dom:
-      data = {}
-      session = dom.getElementsByTagName('Session')
-      call = dom.getElementsByTagName('Callsign')
-      if not call:
-        error = QRZ._getdata(session[0], 'Error')
-        self.log.debug('Not Found: %s', error)
-        return {'__qrzlib_error': 'NotFound'}
+    if not callsign:
+      self._data = _NO_RECORD
+      raise QRZ.NotFound('Empty callsign')
+    record = self._mem_get(callsign)
+    if record is MISS:
+      record = QRZ._to_record(self._get_call(callsign))
+      self._mem_put(callsign, record)
+
+    if record is None:
+      self._data = _NO_RECORD
+      raise QRZ.NotFound(f"{callsign} NotFound")
+    self._data = record
+
+  def _mem_get(self, callsign: str):
+    with self._mem_lock:
+      if callsign in self._notfound:
+        return None
+      try:
+        record = self._mem[callsign]
+      except KeyError:
+        return MISS
+      self._mem.move_to_end(callsign)
+      return record
 
-      for tagname in self._xml_keys:
-        data[tagname] = QRZ._getdata(call[0], tagname)
-    return data
+  def _mem_put(self, callsign: str, record) -> None:
+    with self._mem_lock:
+      if record is None:
+        self._notfound.add(callsign)
+        return
+      self._mem[callsign] = record
+      if len(self._mem) > self._mem_size:
+        self._mem.popitem(last=False)
 
-  def get_call(self, callsign: str):
+  @staticmethod
+  def _to_record(qrz_data: dict) -> Union[_Record, None]:
+    if not qrz_data.get('call'):
+      return None
+    return QRZData(**{_ATTRS[tagname]: value for tagname, value in qrz_data.items()})
+
+  @staticmethod
+  def _to_dict(record) -> dict:
+    return {tagname: getattr(record, attr) for tagname, attr in _ATTRS.items()}
+
+  def get_calls(self, callsigns: Iterable[str],
+                max_workers: int = WORKERS) -> Dict[str, Union[dict, None]]:
+    """Look up a list of callsigns. The callsigns missing from the cache
+    are downloaded from QRZ concurrently by `max_workers` threads.
+    Returns a dictionary with the upper case callsign as key and the
+    record as value, or None if the callsign has not been found.
+
+    """
     if not self.key:
       raise QRZ.SessionError('First authenticate')
-    qrz_data = self._get_call(callsign)
-    if '__qrzlib_error' in qrz_data:
-      self._data = {}
-      raise QRZ.NotFound(f"{callsign} {qrz_data['__qrzlib_error']}")
+    records = {}
+    misses = []
+    callsigns = [call for call in dict.fromkeys(c.upper() for c in callsigns) if call]
+    for callsign in callsigns:
+      record = self._mem_get(callsign)
+      if record is MISS:
+        record = self._cache.get_or_miss(callsign)
+        if record is MISS:
+          misses.append(callsign)
+          continue
+        record = QRZ._to_record(record)
+        self._mem_put(callsign, record)
+      records[callsign] = record
+
+    if misses:
+      records.update(self._fetch_many(misses, max_workers))
+
+    return {callsign: None if records[callsign] is None else QRZ._to_dict(records[callsign])
+            for callsign in callsigns}
+
+  def _fetch_many(self, callsigns: Iterable[str],
+                  max_workers: int) -> Dict[str, Union[_Record, None]]:
+    """Download the callsigns concurrently. Each record is cached as
+    soon as its download completes. A failed lookup or cache write does
+    not stop the others, the error is raised once they are all done."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    records: Dict[str, Union[_Record, None]] = {}
+    errors = []
+    write_error = None
+    try:
+      with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(self._fetch, callsign): callsign for callsign in callsigns}
+        for future in as_completed(futures):
+          callsign = futures[future]
+          try:
+            data = future.result()
+          except (IOError, ET.ParseError) as err:
+            self.log.error('%s: %s', callsign, err)
+            errors.append(err)
+            continue
+          records[callsign] = QRZ._to_record(data)
+          self._mem_put(callsign, records[callsign])
+          try:
+            self._cache.store_key(callsign, data)
+          except IOError as err:
+            write_error = err
+    finally:
+      # A failed write must not hide the error of a lookup. The records
+      # stay in the write-back buffer for the next flush.
+      try:
+        self._cache.flush()
+      except IOError as err:
+        write_error = err
+    if errors:
+      raise IOError(f'{len(errors)} lookups failed') from errors[0]
+    if write_error:
+      raise write_error
+    return records
+
+  def _post(self, params: bytes) -> bytes:
+    """Post the request to QRZ and return the response body. The
+    HTTPS connections are kept open in a pool and reused by the
+    following requests. A connection is re-opened once if the server
+    closed it in the meantime.
+
+    """
+    import http.client
+    headers = {'Content-Type': 'application/x-www-form-urlencoded',
+               'Accept-Encoding': 'gzip', 'User-Agent': AGENT.decode()}
+    try:
+      conn = self._pool.get_nowait()
+    except queue.Empty:
+      conn = None
+    for retry in (True, False):
+      if conn is None:
+        conn = http.client.HTTPSConnection(self._url.netloc, timeout=TIMEOUT)
+      try:
+        conn.request('POST', self._url.path, params, headers)
+        response = conn.getresponse()
+        body = response.read()
+      except (http.client.HTTPException, OSError) as err:
+        conn.close()
+        conn = None
+        if retry:
+          if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug('Connection error: %s, reconnecting', err)
+          continue
+        raise IOError(err) from err
+      break
 
-    for tagname, value in qrz_data.items():
-      self._data[tagname] = value
+    self._pool.put(conn)
+
+    if response.status != 200:
+      raise IOError(f'QRZ error: {response.status} {response.reason}')
+    if response.getheader('Content-Encoding') == 'gzip':
+      import gzip
+      try:
+        body = gzip.decompress(body)
+      except (OSError, EOFError, zlib.error) as err:
+        raise IOError(err) from err
+    return body
 
   @staticmethod
-  def _getdata(dom, nodename: str) -> Union[str, None]:
-    try:
-      data = []
-      node = dom.getElementsByTagName(nodename)[0]
-      for child in node.childNodes:
-        if child.nodeType == child.TEXT_NODE:
-          data.append(child.data)
-      return ''.join(data)
-    except IndexError:
+  def _getdata(elem: Union[ET.Element, None], nodename: str) -> Union[str, None]:
+    """Return the text of the child `nodename` of `elem`, in any xml
+    namespace."""
+    if elem is None:
       return None
+    return elem.findtext('{*}' + nodename)
 
   def to_json(self) -> str:
-    return json.dumps(self._data)
+    import json
+    return json.dumps(self.to_dict())
 
   def to_dict(self) -> dict:
-    return self._data
+    if self._data is _NO_RECORD:
+      return {}
+    return QRZ._to_dict(self._data)
 
   @property
   def latlon(self) -> Union[Tuple[float, float], None]:
-    if self._data['lat'] and self._data['lon']:
-      return (float(self._data['lat']), float(self._data['lon']))
+    if self._data.lat and self._data.lon:
+      return (float(self._data.lat), float(self._data.lon))
     return None
 
   @property
   def zip(self) -> str:
-    return self._data['zip']
+    return self._data.zip
 
   @property
   def country(self) -> str:
-    return self._data['country']
+    return self._data.country
 
   @property
   def state(self) -> str:
-    return self._data['state']
+    return self._data.state
 
   @property
   def grid(self) -> str:
-    return self._data['grid']
+    return self._data.grid
 
   @property
   def fname(self) -> str:
-    return self._data['fname']
+    return self._data.fname
 
   @property
   def name(self) -> str:
-    return self._data['name']
+    return self._data.name
 
   @property
   def fullname(self) -> str:
-    return self._data['name_fmt']
+    return self._data.name_fmt
 
   @property
   def email(self) -> str:
-    return self._data['email']
+    return self._data.email
 
 
 def main() -> None:
+  from getpass import getpass
   qrz = QRZ()
   qrz_call = os.getenv('QRZ_CALL', 'W6BSD')
   key = os.getenv('QRZ_KEY') or getpass(f'"{qrz_call}" XML Data key: ')